@@ -0,0 +1,42 @@
+"""JSON helpers — orjson when installed, stdlib json otherwise."""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    def dumps_indent(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    dumpb = orjson.dumps
+
+    loads = orjson.loads
+
+    def fragment(raw: bytes | str):
+        """Wrap already-encoded JSON so dumpb() embeds it without reparsing."""
+        return orjson.Fragment(raw)
+
+else:
+
+    def dumps(obj) -> str:
+        return json.dumps(obj)
+
+    def dumps_indent(obj) -> str:
+        # ensure_ascii=False matches orjson, which writes UTF-8 as-is
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+    def dumpb(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    loads = json.loads
+
+    def fragment(raw: bytes | str):
+        return json.loads(raw)
@@ -1,5 +1,7 @@
 """launchd plist generation and install/uninstall for macOS."""
 
+import functools
+import shutil
 import subprocess
 import sys
 from pathlib import Path
@@ -10,10 +12,9 @@ PROJECT_DIR = Path(__file__).parent.parent
 LOG_DIR = PROJECT_DIR / "logs"
 
 
+@functools.lru_cache(maxsize=1)
 def _generate_plist() -> str:
-    uv_path = subprocess.run(
-        ["which", "uv"], capture_output=True, text=True
-    ).stdout.strip() or "/usr/local/bin/uv"
+    uv_path = shutil.which("uv") or "/usr/local/bin/uv"
 
     return f"""<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
@@ -50,7 +51,11 @@ def _generate_plist() -> str:
 def start():
     """Install and load the launchd daemon."""
     LOG_DIR.mkdir(parents=True, exist_ok=True)
-    PLIST_PATH.write_text(_generate_plist())
+    content = _generate_plist()
+    if PLIST_PATH.exists() and PLIST_PATH.read_text() == content:
+        print(f"Sprout scheduler daemon already installed. Logs: {LOG_DIR}/scheduler.log")
+        return
+    PLIST_PATH.write_text(content)
     subprocess.run(["launchctl", "load", str(PLIST_PATH)], check=True)
     print(f"Sprout scheduler daemon started. Logs: {LOG_DIR}/scheduler.log")
 
@@ -1,14 +1,25 @@
 """SQLite persistence for Sprout."""
 
-import json
+import asyncio
+import logging
 import os
-from datetime import datetime, timezone
+import sqlite3
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 
 import aiosqlite
 
+from sprout import _json
 from sprout.models import Chunk, Confidence, Provenance, ScheduledTask, TokenUsage
 
+log = logging.getLogger("sprout.db")
+
+
 def _resolve_db_path() -> Path:
     env = os.environ.get("SPROUT_DB_PATH")
     if env:
@@ -19,82 +30,440 @@ def _resolve_db_path() -> Path:
     return p
 
 
+def _resolve_synchronous() -> str:
+    mode = os.environ.get("SPROUT_SYNCHRONOUS", "NORMAL").upper()
+    if mode not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+        raise ValueError(f"SPROUT_SYNCHRONOUS must be OFF, NORMAL, FULL or EXTRA, got {mode!r}")
+    return mode
+
+
 DB_PATH = _resolve_db_path()
+# NORMAL is crash-safe in WAL mode and fsyncs only on checkpoint
+SYNCHRONOUS = _resolve_synchronous()
+
+# UPDATE ... RETURNING needs SQLite 3.35+ (older macOS system builds lack it)
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Size of the read-only connection pool used by query helpers
+READ_POOL_SIZE = 4
 
+# Queued writes are committed together: up to this many statements...
+WRITE_BATCH_SIZE = 500
+# ...collected for at most this long (seconds) after the first one arrives
+WRITE_BATCH_WINDOW = 0.005
+
+# Single writer connection; SQLite allows one writer at a time anyway
 _db: aiosqlite.Connection | None = None
+# Idle read connections, checked out via _reader()
+_read_pool: asyncio.Queue[aiosqlite.Connection] | None = None
+_read_conns: list[aiosqlite.Connection] = []
+# Serializes first-use initialization; created lazily on the running loop
+_init_lock: asyncio.Lock | None = None
+# Pending (sql, params, future) writes drained by _writer_loop()
+_write_queue: asyncio.Queue[tuple[str, tuple, asyncio.Future]] | None = None
+_writer_task: asyncio.Task | None = None
+# Held while a transaction is open on the writer connection
+_write_lock: asyncio.Lock | None = None
+
+
+async def _connect() -> aiosqlite.Connection:
+    conn = await aiosqlite.connect(DB_PATH)
+    conn.row_factory = aiosqlite.Row
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+    await conn.execute("PRAGMA temp_store=MEMORY")
+    await conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+    await conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    await conn.execute("PRAGMA wal_autocheckpoint=1000")
+    return conn
+
+
+async def init_db() -> aiosqlite.Connection:
+    """Open connections, create tables and start the writer — exactly once.
+
+    Called at server/daemon startup; get_db() falls back to it on first use.
+    """
+    global _db, _read_pool, _init_lock, _write_queue, _writer_task, _write_lock
+    if _init_lock is None:
+        _init_lock = asyncio.Lock()
+    async with _init_lock:
+        # Another caller may have finished initializing while we waited
+        if _db is None:
+            writer = await _connect()
+            await _init_tables(writer)
+            pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+            for _ in range(READ_POOL_SIZE):
+                conn = await _connect()
+                _read_conns.append(conn)
+                pool.put_nowait(conn)
+            _read_pool = pool
+            _write_lock = asyncio.Lock()
+            _write_queue = asyncio.Queue()
+            _writer_task = asyncio.create_task(_writer_loop(writer))
+            _db = writer
+    return _db
 
 
 async def get_db() -> aiosqlite.Connection:
-    global _db
-    if _db is None:
-        _db = await aiosqlite.connect(DB_PATH)
-        _db.row_factory = aiosqlite.Row
-        await _db.execute("PRAGMA journal_mode=WAL")
-        await _init_tables(_db)
-    return _db
+    if _db is not None:
+        return _db
+    return await init_db()
+
+
+@asynccontextmanager
+async def _reader() -> AsyncIterator[aiosqlite.Connection]:
+    """Borrow a pooled read connection so queries don't queue behind writes.
+
+    Callers use execute_fetchall(): one hop to the connection's worker thread
+    instead of three (execute, fetchall, cursor close).
+    """
+    await get_db()
+    # close_db() may swap the globals out while the read is in flight
+    pool = _read_pool
+    conn = await pool.get()
+    try:
+        yield conn
+    finally:
+        # Only return connections close_db() hasn't closed and dropped
+        if conn in _read_conns:
+            pool.put_nowait(conn)
+
+
+async def _write(sql: str, params: tuple) -> None:
+    """Queue a write for the batching writer and wait until it is committed."""
+    await get_db()
+    if _writer_task.done():
+        raise RuntimeError("Sprout database writer has stopped")
+    fut = asyncio.get_running_loop().create_future()
+    _write_queue.put_nowait((sql, params, fut))
+    await fut
+
+
+async def _write_many(sql: str, rows: list[tuple]) -> None:
+    """Run one statement over many rows atomically, bypassing the batching queue."""
+    if not rows:
+        return
+    db = await get_db()
+    async with _write_lock:
+        try:
+            await db.execute("BEGIN IMMEDIATE")
+            await db.executemany(sql, rows)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def _drain(batch: list) -> None:
+    while len(batch) < WRITE_BATCH_SIZE:
+        try:
+            batch.append(_write_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            return
+
+
+async def _writer_loop(db: aiosqlite.Connection) -> None:
+    """Commit queued writes in batches — one transaction per batch, not per row."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _write_queue.get()]
+        try:
+            _drain(batch)
+            # A lone write commits immediately; only linger when other
+            # writers are already lining up, to give the burst time to land
+            if len(batch) > 1:
+                deadline = loop.time() + WRITE_BATCH_WINDOW
+                while len(batch) < WRITE_BATCH_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(_write_queue.get(), timeout))
+                    except TimeoutError:
+                        break
+                    _drain(batch)
+            async with _write_lock:
+                await _flush(db, batch)
+        except Exception as e:
+            log.exception("Write batch failed")
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+
+async def _flush(db: aiosqlite.Connection, batch: list) -> None:
+    try:
+        await db.execute("BEGIN IMMEDIATE")
+        # Consecutive writes sharing a statement go through one executemany
+        for sql, group in groupby(batch, key=itemgetter(0)):
+            rows = [params for _, params, _ in group]
+            if len(rows) == 1:
+                await db.execute(sql, rows[0])
+            else:
+                await db.executemany(sql, rows)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        if len(batch) == 1:
+            fut = batch[0][2]
+            if not fut.done():
+                fut.set_exception(e)
+            return
+        # Replay one by one so a bad row only fails its own caller
+        for item in batch:
+            await _flush(db, [item])
+        return
+    for _, _, fut in batch:
+        if not fut.done():
+            fut.set_result(None)
+
+
+async def close_db() -> None:
+    """Flush queued writes, then close the writer and all pooled read connections."""
+    global _db, _read_pool, _init_lock, _write_queue, _writer_task, _write_lock
+    if _writer_task is not None:
+        if not _writer_task.done():
+            await _write_queue.join()
+            _writer_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await _writer_task
+        # Anything still queued can no longer be written
+        while not _write_queue.empty():
+            _, _, fut = _write_queue.get_nowait()
+            if not fut.done():
+                fut.set_exception(RuntimeError("Sprout database closed"))
+        _writer_task = None
+        _write_queue = None
+        _write_lock = None
+    for conn in _read_conns:
+        await conn.close()
+    _read_conns.clear()
+    _read_pool = None
+    if _db is not None:
+        await _db.close()
+        _db = None
+    _init_lock = None
+
+
+# Bumped whenever _init_tables needs to migrate existing databases
+SCHEMA_VERSION = 3
+
+# Column definitions per table, shared by schema creation and table rebuilds
+_TABLES = {
+    "chunks": """
+        id TEXT PRIMARY KEY,
+        project TEXT NOT NULL,
+        node_id TEXT NOT NULL,
+        node_type TEXT NOT NULL,
+        field TEXT NOT NULL,
+        content TEXT NOT NULL,
+        produced_by TEXT NOT NULL,
+        produced_at INTEGER NOT NULL,
+        task_type TEXT NOT NULL,
+        sources BLOB,
+        verified_by TEXT,
+        verified_at INTEGER,
+        confidence TEXT NOT NULL DEFAULT 'seed',
+        review_notes TEXT,
+        UNIQUE(project, node_id, field)
+    """,
+    "scheduled_tasks": """
+        id TEXT PRIMARY KEY,
+        task_name TEXT NOT NULL,
+        task_params TEXT,
+        run_at INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        status TEXT DEFAULT 'pending'
+    """,
+    "task_runs": """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id TEXT NOT NULL,
+        task_name TEXT NOT NULL,
+        started_at INTEGER NOT NULL,
+        completed_at INTEGER,
+        status TEXT NOT NULL,
+        result TEXT
+    """,
+    "token_usage": """
+        id TEXT PRIMARY KEY,
+        chunk_id TEXT REFERENCES chunks(id),
+        model TEXT NOT NULL,
+        estimated_tokens INTEGER NOT NULL,
+        recorded_at INTEGER NOT NULL
+    """,
+    "retries": """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        chunk_id TEXT NOT NULL,
+        error_message TEXT NOT NULL,
+        recorded_at INTEGER NOT NULL
+    """,
+    # Running total per chunk so record_retry doesn't count the history
+    "retry_counts": """
+        chunk_id TEXT PRIMARY KEY,
+        cnt INTEGER NOT NULL
+    """,
+}
+
+_INDEXES = """
+    -- Equality columns first, then the ORDER BY column of get_review_queue
+    CREATE INDEX IF NOT EXISTS idx_review_queue
+        ON chunks(confidence, project, node_type, produced_at);
+    -- Also serves export_chunks' (project, confidence) filter via its prefix
+    CREATE INDEX IF NOT EXISTS idx_chunks_stats ON chunks(project, confidence, task_type);
+    -- Superseded by the composite indices above
+    DROP INDEX IF EXISTS idx_confidence;
+    DROP INDEX IF EXISTS idx_project;
+
+    -- Covering index for get_cost_report's join: the token_usage side never touches row pages
+    CREATE INDEX IF NOT EXISTS idx_token_usage_chunk
+        ON token_usage(chunk_id, model, estimated_tokens);
+    -- Per-chunk retry history in time order, widened from retries(chunk_id)
+    DROP INDEX IF EXISTS idx_retries_chunk;
+    CREATE INDEX IF NOT EXISTS idx_retries_chunk_time ON retries(chunk_id, recorded_at);
+    -- Scheduler polls: status equality, then a run_at range / ORDER BY
+    CREATE INDEX IF NOT EXISTS idx_tasks_due ON scheduled_tasks(status, run_at);
+"""
+
+# Timestamp columns stored as ISO-8601 TEXT before schema version 1
+_TIMESTAMP_COLUMNS = {
+    "chunks": ("produced_at", "verified_at"),
+    "scheduled_tasks": ("run_at", "created_at"),
+    "task_runs": ("started_at", "completed_at"),
+    "token_usage": ("recorded_at",),
+    "retries": ("recorded_at",),
+}
 
 
 async def _init_tables(db: aiosqlite.Connection) -> None:
-    await db.executescript("""
-        CREATE TABLE IF NOT EXISTS chunks (
-            id TEXT PRIMARY KEY,
-            project TEXT NOT NULL,
-            node_id TEXT NOT NULL,
-            node_type TEXT NOT NULL,
-            field TEXT NOT NULL,
-            content TEXT NOT NULL,
-            produced_by TEXT NOT NULL,
-            produced_at TEXT NOT NULL,
-            task_type TEXT NOT NULL,
-            sources TEXT,
-            verified_by TEXT,
-            verified_at TEXT,
-            confidence TEXT NOT NULL DEFAULT 'seed',
-            review_notes TEXT,
-            UNIQUE(project, node_id, field)
-        );
-        CREATE INDEX IF NOT EXISTS idx_confidence ON chunks(confidence);
-        CREATE INDEX IF NOT EXISTS idx_project ON chunks(project);
-
-        CREATE TABLE IF NOT EXISTS scheduled_tasks (
-            id TEXT PRIMARY KEY,
-            task_name TEXT NOT NULL,
-            task_params TEXT,
-            run_at TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            status TEXT DEFAULT 'pending'
-        );
-
-        CREATE TABLE IF NOT EXISTS task_runs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id TEXT NOT NULL,
-            task_name TEXT NOT NULL,
-            started_at TEXT NOT NULL,
-            completed_at TEXT,
-            status TEXT NOT NULL,
-            result TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS token_usage (
-            id TEXT PRIMARY KEY,
-            chunk_id TEXT REFERENCES chunks(id),
-            model TEXT NOT NULL,
-            estimated_tokens INTEGER NOT NULL,
-            recorded_at TEXT NOT NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS retries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            chunk_id TEXT NOT NULL,
-            error_message TEXT NOT NULL,
-            recorded_at TEXT NOT NULL
-        );
-        CREATE INDEX IF NOT EXISTS idx_retries_chunk ON retries(chunk_id);
-    """)
+    async with db.execute("PRAGMA user_version") as cursor:
+        version = (await cursor.fetchone())[0]
+    if version < 1:
+        await _migrate_integer_timestamps(db)
+    tables = "".join(
+        f"CREATE TABLE IF NOT EXISTS {name} ({columns});" for name, columns in _TABLES.items()
+    )
+    await db.executescript(tables + _INDEXES)
+    if version < 2:
+        await db.execute("""
+            INSERT OR REPLACE INTO retry_counts (chunk_id, cnt)
+            SELECT chunk_id, COUNT(*) FROM retries GROUP BY chunk_id
+        """)
+        await db.commit()
+    if version < 3:
+        # Blobs are stored as-is even in the old TEXT-affinity column
+        await db.execute(
+            "UPDATE chunks SET sources = CAST(sources AS BLOB) WHERE typeof(sources) = 'text'"
+        )
+        await db.commit()
+    await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    # Refresh planner statistics when they are missing or stale
+    await db.execute("PRAGMA optimize")
+
+
+async def _migrate_integer_timestamps(db: aiosqlite.Connection) -> None:
+    """Rebuild pre-v1 tables, converting ISO TEXT timestamps to INTEGER unix-µs.
+
+    Column affinity can't be changed in place, and a TEXT column would turn the
+    integers back into strings, so each existing table is copied into a fresh one.
+    """
+    await db.create_function("sprout_iso_to_us", 1, _iso_to_us, deterministic=True)
+    await db.execute("BEGIN IMMEDIATE")
+    try:
+        for table, ts_columns in _TIMESTAMP_COLUMNS.items():
+            async with db.execute(f"PRAGMA table_info({table})") as cursor:
+                columns = [row["name"] for row in await cursor.fetchall()]
+            if not columns:
+                continue
+            names = ", ".join(columns)
+            values = ", ".join(
+                f"sprout_iso_to_us({c})" if c in ts_columns else c for c in columns
+            )
+            await db.execute(f"CREATE TABLE {table}_v1 ({_TABLES[table]})")
+            await db.execute(f"INSERT INTO {table}_v1 ({names}) SELECT {values} FROM {table}")
+            await db.execute(f"DROP TABLE {table}")
+            await db.execute(f"ALTER TABLE {table}_v1 RENAME TO {table}")
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_us(dt: datetime) -> int:
+    """Datetime → integer unix microseconds; naive values are taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _MICROSECOND
+
+
+def _from_us(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+def _now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def _iso_to_us(value: str | int | None) -> int | None:
+    if value is None or isinstance(value, int):
+        return value
+    return _to_us(datetime.fromisoformat(value))
+
+
+# Statements reused on every call; sqlite3 caches the prepared form per SQL string
+INSERT_CHUNK_SQL = """INSERT OR REPLACE INTO chunks
+    (id, project, node_id, node_type, field, content,
+     produced_by, produced_at, task_type, sources,
+     verified_by, verified_at, confidence, review_notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+INSERT_TOKEN_SQL = (
+    "INSERT INTO token_usage (id, chunk_id, model, estimated_tokens, recorded_at) VALUES (?, ?, ?, ?, ?)"
+)
+INSERT_SCHEDULED_TASK_SQL = (
+    "INSERT INTO scheduled_tasks (id, task_name, task_params, run_at, created_at, status) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+UPDATE_TASK_STATUS_SQL = "UPDATE scheduled_tasks SET status = ? WHERE id = ?"
+INSERT_TASK_SQL = (
+    "INSERT INTO task_runs (task_id, task_name, started_at, status, result) VALUES (?, ?, ?, ?, ?)"
+)
+INSERT_RETRY_SQL = "INSERT INTO retries (chunk_id, error_message, recorded_at) VALUES (?, ?, ?)"
+BUMP_RETRY_COUNT_SQL = """INSERT INTO retry_counts (chunk_id, cnt) VALUES (?, 1)
+    ON CONFLICT(chunk_id) DO UPDATE SET cnt = cnt + 1"""
+MARK_REVIEWED_SQL = """UPDATE chunks SET verified_by = ?, verified_at = ?,
+    confidence = ?, review_notes = ? WHERE id = ?"""
+
+# min_confidence -> (WHERE fragment, params) for export; unknown levels fall back to "watered"
+_CONF_FILTER = {
+    "seed": ("confidence IN (?, ?, ?)", ("seed", "watered", "sprouted")),
+    "watered": ("confidence IN (?, ?)", ("watered", "sprouted")),
+    "sprouted": ("confidence = ?", ("sprouted",)),
+}
+_REVIEW_DEFAULT_FILTER = "confidence IN ('seed', 'watered')"
+
+
+def _encode_sources(sources: list[str]) -> bytes:
+    """Encode sources for the BLOB column as UTF-8 JSON bytes.
+
+    The first byte doubles as a format tag: JSON arrays start with b"[", so a
+    future encoding can claim any other leading byte without a rewrite.
+    """
+    return _json.dumpb(sources)
+
+
+def _decode_sources(raw: bytes | str | None) -> list[str]:
+    return _json.loads(raw) if raw else []
 
 
 def _row_to_chunk(row: aiosqlite.Row) -> Chunk:
-    return Chunk(
+    # Rows come from our own writes, so skip Pydantic validation
+    return Chunk.model_construct(
         id=row["id"],
         project=row["project"],
         node_id=row["node_id"],
@@ -102,39 +471,39 @@ def _row_to_chunk(row: aiosqlite.Row) -> Chunk:
         field=row["field"],
         content=row["content"],
         review_notes=row["review_notes"],
-        provenance=Provenance(
+        provenance=Provenance.model_construct(
             produced_by=row["produced_by"],
-            produced_at=datetime.fromisoformat(row["produced_at"]),
+            produced_at=_from_us(row["produced_at"]),
             task_type=row["task_type"],
-            sources=json.loads(row["sources"]) if row["sources"] else [],
+            sources=_decode_sources(row["sources"]),
             verified_by=row["verified_by"],
-            verified_at=datetime.fromisoformat(row["verified_at"]) if row["verified_at"] else None,
+            verified_at=_from_us(row["verified_at"]) if row["verified_at"] is not None else None,
             confidence=Confidence(row["confidence"]),
         ),
     )
 
 
-async def insert_chunk(chunk: Chunk) -> None:
-    db = await get_db()
+def _chunk_params(chunk: Chunk) -> tuple:
     p = chunk.provenance
-    await db.execute(
-        """INSERT OR REPLACE INTO chunks
-           (id, project, node_id, node_type, field, content,
-            produced_by, produced_at, task_type, sources,
-            verified_by, verified_at, confidence, review_notes)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            chunk.id, chunk.project, chunk.node_id, chunk.node_type,
-            chunk.field, chunk.content,
-            p.produced_by, p.produced_at.isoformat(), p.task_type,
-            json.dumps(p.sources),
-            p.verified_by,
-            p.verified_at.isoformat() if p.verified_at else None,
-            p.confidence.value,
-            chunk.review_notes,
-        ),
+    return (
+        chunk.id, chunk.project, chunk.node_id, chunk.node_type,
+        chunk.field, chunk.content,
+        p.produced_by, _to_us(p.produced_at), p.task_type,
+        _encode_sources(p.sources),
+        p.verified_by,
+        _to_us(p.verified_at) if p.verified_at else None,
+        p.confidence.value,
+        chunk.review_notes,
     )
-    await db.commit()
+
+
+async def insert_chunk(chunk: Chunk) -> None:
+    await _write(INSERT_CHUNK_SQL, _chunk_params(chunk))
+
+
+async def insert_chunks_many(chunks: list[Chunk]) -> None:
+    """Insert many chunks with one executemany inside a single transaction."""
+    await _write_many(INSERT_CHUNK_SQL, [_chunk_params(c) for c in chunks])
 
 
 async def get_review_queue(
@@ -143,7 +512,6 @@ async def get_review_queue(
     confidence: str | None = None,
     limit: int = 50,
 ) -> list[Chunk]:
-    db = await get_db()
     clauses = []
     params: list = []
     if project:
@@ -156,13 +524,13 @@ async def get_review_queue(
         clauses.append("confidence = ?")
         params.append(confidence)
     else:
-        clauses.append("confidence IN ('seed', 'watered')")
+        clauses.append(_REVIEW_DEFAULT_FILTER)
 
     where = " AND ".join(clauses) if clauses else "1=1"
     query = f"SELECT * FROM chunks WHERE {where} ORDER BY produced_at LIMIT ?"
     params.append(limit)
-    async with db.execute(query, params) as cursor:
-        rows = await cursor.fetchall()
+    async with _reader() as db:
+        rows = await db.execute_fetchall(query, params)
     return [_row_to_chunk(r) for r in rows]
 
 
@@ -173,158 +541,252 @@ async def mark_reviewed(
     review_notes: str | None = None,
 ) -> Chunk | None:
     db = await get_db()
-    now = datetime.now(timezone.utc).isoformat()
-    await db.execute(
-        """UPDATE chunks SET verified_by = ?, verified_at = ?,
-           confidence = ?, review_notes = ? WHERE id = ?""",
-        (verified_by, now, new_confidence, review_notes, chunk_id),
-    )
-    await db.commit()
-    async with db.execute("SELECT * FROM chunks WHERE id = ?", (chunk_id,)) as cursor:
-        row = await cursor.fetchone()
+    params = (verified_by, _now_us(), new_confidence, review_notes, chunk_id)
+    async with _write_lock:
+        if HAS_RETURNING:
+            async with db.execute(MARK_REVIEWED_SQL + " RETURNING *", params) as cursor:
+                row = await cursor.fetchone()
+            await db.commit()
+        else:
+            await db.execute(MARK_REVIEWED_SQL, params)
+            await db.commit()
+            async with db.execute("SELECT * FROM chunks WHERE id = ?", (chunk_id,)) as cursor:
+                row = await cursor.fetchone()
     return _row_to_chunk(row) if row else None
 
 
 async def get_stats(project: str | None = None) -> dict:
-    db = await get_db()
     where = "WHERE project = ?" if project else ""
     params = [project] if project else []
 
     stats: dict = {"by_confidence": {}, "by_project": {}, "by_type": {}, "total": 0}
 
-    query = f"SELECT confidence, COUNT(*) as cnt FROM chunks {where} GROUP BY confidence"
-    async with db.execute(query, params) as cursor:
-        for row in await cursor.fetchall():
-            stats["by_confidence"][row["confidence"]] = row["cnt"]
-            stats["total"] += row["cnt"]
-
-    query = f"SELECT project, COUNT(*) as cnt FROM chunks {where} GROUP BY project"
-    async with db.execute(query, params) as cursor:
-        for row in await cursor.fetchall():
-            stats["by_project"][row["project"]] = row["cnt"]
-
-    query = f"SELECT task_type, COUNT(*) as cnt FROM chunks {where} GROUP BY task_type"
-    async with db.execute(query, params) as cursor:
-        for row in await cursor.fetchall():
-            stats["by_type"][row["task_type"]] = row["cnt"]
-
+    # One pass over the covering index; the three breakdowns are folded here
+    query = f"""
+        SELECT confidence, project, task_type, COUNT(*) as cnt
+        FROM chunks {where} GROUP BY confidence, project, task_type
+    """
+    by_confidence = stats["by_confidence"]
+    by_project = stats["by_project"]
+    by_type = stats["by_type"]
     # Token usage stats
     token_query = """
         SELECT model, SUM(estimated_tokens) as total_tokens, COUNT(*) as count
         FROM token_usage GROUP BY model
     """
-    async with db.execute(token_query) as cursor:
-        token_stats = {}
-        for row in await cursor.fetchall():
-            token_stats[row["model"]] = {
-                "total_tokens": row["total_tokens"],
-                "count": row["count"],
-            }
-        stats["token_usage"] = token_stats
+    async with _reader() as db:
+        rows = await db.execute_fetchall(query, params)
+        token_rows = await db.execute_fetchall(token_query)
 
-    return stats
+    for row in rows:
+        cnt = row["cnt"]
+        by_confidence[row["confidence"]] = by_confidence.get(row["confidence"], 0) + cnt
+        by_project[row["project"]] = by_project.get(row["project"], 0) + cnt
+        by_type[row["task_type"]] = by_type.get(row["task_type"], 0) + cnt
+        stats["total"] += cnt
 
+    stats["token_usage"] = {
+        row["model"]: {"total_tokens": row["total_tokens"], "count": row["count"]}
+        for row in token_rows
+    }
 
-async def export_chunks(
-    project: str | None = None,
-    min_confidence: str = "watered",
-) -> list[dict]:
-    db = await get_db()
-    confidence_levels = {"seed": 0, "watered": 1, "sprouted": 2}
-    min_level = confidence_levels.get(min_confidence, 1)
-    allowed = [k for k, v in confidence_levels.items() if v >= min_level]
-    placeholders = ",".join("?" * len(allowed))
+    return stats
 
-    clauses = [f"confidence IN ({placeholders})"]
-    params: list = list(allowed)
+
+def _export_record(row: aiosqlite.Row, sources) -> dict:
+    return {
+        "nodeId": row["node_id"],
+        "nodeType": row["node_type"],
+        "field": row["field"],
+        "content": row["content"],
+        "confidence": row["confidence"],
+        "producedBy": row["produced_by"],
+        "sources": sources,
+        "verifiedBy": row["verified_by"],
+    }
+
+
+async def _iter_export_rows(
+    project: str | None,
+    min_confidence: str,
+) -> AsyncIterator[aiosqlite.Row]:
+    frag, conf_params = _CONF_FILTER.get(min_confidence, _CONF_FILTER["watered"])
+    clauses = [frag]
+    params: list = list(conf_params)
     if project:
         clauses.append("project = ?")
         params.append(project)
 
     where = " AND ".join(clauses)
-    async with db.execute(f"SELECT * FROM chunks WHERE {where}", params) as cursor:
-        rows = await cursor.fetchall()
+    query = f"SELECT * FROM chunks WHERE {where}"
+    async with _reader() as db, db.execute(query, params) as cursor:
+        async for row in cursor:
+            yield row
+
+
+async def iter_export_chunks(
+    project: str | None = None,
+    min_confidence: str = "watered",
+) -> AsyncIterator[dict]:
+    """Yield export records one row at a time instead of materializing them all."""
+    async for row in _iter_export_rows(project, min_confidence):
+        # Decoded, not passed through: the export tools pretty-print with OPT_INDENT_2,
+        # which writes an orjson.Fragment verbatim and would change their output
+        yield _export_record(row, _decode_sources(row["sources"]))
 
-    results = []
-    for row in rows:
-        results.append({
-            "nodeId": row["node_id"],
-            "nodeType": row["node_type"],
-            "field": row["field"],
-            "content": row["content"],
-            "confidence": row["confidence"],
-            "producedBy": row["produced_by"],
-            "sources": json.loads(row["sources"]) if row["sources"] else [],
-            "verifiedBy": row["verified_by"],
-        })
-    return results
+
+async def export_chunks(
+    project: str | None = None,
+    min_confidence: str = "watered",
+) -> list[dict]:
+    return [c async for c in iter_export_chunks(project, min_confidence)]
+
+
+async def export_chunks_json(
+    path: str | Path,
+    project: str | None = None,
+    min_confidence: str = "watered",
+) -> int:
+    """Write export records to `path` as newline-delimited JSON. Returns the row count."""
+    count = 0
+    with open(path, "wb") as f:
+        async for row in _iter_export_rows(project, min_confidence):
+            # sources is stored as JSON already; copy it through instead of reparsing
+            record = _export_record(row, _json.fragment(row["sources"] or b"[]"))
+            f.write(_json.dumpb(record))
+            f.write(b"\n")
+            count += 1
+    return count
+
+
+def estimate_tokens(content: str) -> int:
+    """Rough output token count: ~1.3 tokens per whitespace-separated word."""
+    # str.split() runs the whitespace scan in C; it measured ~3-4x faster than
+    # allocation-free re.finditer/re.subn counting, and char-count shortcuts
+    # would change the numbers cost reports are based on.
+    return int(len(content.split()) * 1.3)
 
 
 async def record_token_usage(chunk_id: str, model: str, content: str) -> None:
-    db = await get_db()
-    word_count = len(content.split())
-    estimated = int(word_count * 1.3)  # ~1.3 tokens/word for output
-    usage = TokenUsage(chunk_id=chunk_id, model=model, estimated_tokens=estimated)
-    await db.execute(
-        "INSERT INTO token_usage (id, chunk_id, model, estimated_tokens, recorded_at) VALUES (?, ?, ?, ?, ?)",
-        (usage.id, usage.chunk_id, usage.model, usage.estimated_tokens, usage.recorded_at.isoformat()),
+    usage = TokenUsage(chunk_id=chunk_id, model=model, estimated_tokens=estimate_tokens(content))
+    await _write(
+        INSERT_TOKEN_SQL,
+        (usage.id, usage.chunk_id, usage.model, usage.estimated_tokens, _to_us(usage.recorded_at)),
     )
-    await db.commit()
 
 
 # --- Scheduled tasks ---
 
 async def insert_scheduled_task(task: ScheduledTask) -> None:
-    db = await get_db()
-    await db.execute(
-        "INSERT INTO scheduled_tasks (id, task_name, task_params, run_at, created_at, status) VALUES (?, ?, ?, ?, ?, ?)",
-        (task.id, task.task_name, json.dumps(task.task_params) if task.task_params else None,
-         task.run_at.isoformat(), task.created_at.isoformat(), task.status),
+    await _write(
+        INSERT_SCHEDULED_TASK_SQL,
+        (task.id, task.task_name, _json.dumps(task.task_params) if task.task_params else None,
+         _to_us(task.run_at), _to_us(task.created_at), task.status),
+    )
+
+
+def _row_to_task(r: aiosqlite.Row) -> ScheduledTask:
+    return ScheduledTask.model_construct(
+        id=r["id"], task_name=r["task_name"],
+        task_params=_json.loads(r["task_params"]) if r["task_params"] else None,
+        run_at=_from_us(r["run_at"]),
+        created_at=_from_us(r["created_at"]),
+        status=r["status"],
     )
-    await db.commit()
 
 
 async def get_pending_tasks() -> list[ScheduledTask]:
-    db = await get_db()
-    async with db.execute(
-        "SELECT * FROM scheduled_tasks WHERE status = 'pending' ORDER BY run_at"
-    ) as cursor:
-        rows = await cursor.fetchall()
-    return [
-        ScheduledTask(
-            id=r["id"], task_name=r["task_name"],
-            task_params=json.loads(r["task_params"]) if r["task_params"] else None,
-            run_at=datetime.fromisoformat(r["run_at"]),
-            created_at=datetime.fromisoformat(r["created_at"]),
-            status=r["status"],
-        )
-        for r in rows
-    ]
+    query = "SELECT * FROM scheduled_tasks WHERE status = 'pending' ORDER BY run_at"
+    async with _reader() as db:
+        rows = await db.execute_fetchall(query)
+    return [_row_to_task(r) for r in rows]
+
+
+async def get_due_tasks(now_us: int) -> list[ScheduledTask]:
+    """Pending tasks with run_at <= now_us (unix microseconds), oldest first."""
+    query = "SELECT * FROM scheduled_tasks WHERE status = 'pending' AND run_at <= ? ORDER BY run_at"
+    async with _reader() as db:
+        rows = await db.execute_fetchall(query, (now_us,))
+    return [_row_to_task(r) for r in rows]
 
 
 async def update_task_status(task_id: str, status: str) -> None:
-    db = await get_db()
-    await db.execute("UPDATE scheduled_tasks SET status = ? WHERE id = ?", (status, task_id))
-    await db.commit()
+    await _write(UPDATE_TASK_STATUS_SQL, (status, task_id))
 
 
 async def record_task_run(task_id: str, task_name: str, status: str, result: str | None = None) -> None:
-    db = await get_db()
-    now = datetime.now(timezone.utc).isoformat()
-    await db.execute(
-        "INSERT INTO task_runs (task_id, task_name, started_at, status, result) VALUES (?, ?, ?, ?, ?)",
+    now = _now_us()
+    await _write(
+        INSERT_TASK_SQL,
         (task_id, task_name, now, status, result),
     )
-    await db.commit()
+
+
+async def get_next_run_at() -> int | None:
+    """Earliest pending run_at in unix microseconds, or None when nothing is pending."""
+    async with _reader() as db:
+        rows = await db.execute_fetchall(
+            "SELECT MIN(run_at) FROM scheduled_tasks WHERE status = 'pending'"
+        )
+    return rows[0][0]
+
+
+def _glob_escape(text: str) -> str:
+    # GLOB is case-sensitive, so unlike LIKE it can range-scan the primary key
+    return "".join(f"[{ch}]" if ch in "*?[" else ch for ch in text)
+
+
+async def find_pending_by_id_prefix(prefix: str) -> list[tuple[str, str]]:
+    """(id, task_name) of up to two pending tasks whose id starts with prefix.
+
+    Two rows are enough for callers to tell a unique match from an ambiguous one.
+    """
+    if not prefix:
+        return []
+    async with _reader() as db:
+        rows = await db.execute_fetchall(
+            "SELECT id, task_name FROM scheduled_tasks "
+            # +status keeps the planner off idx_tasks_due so the id range drives the scan
+            "WHERE id GLOB ? AND +status = 'pending' LIMIT 2",
+            (_glob_escape(prefix) + "*",),
+        )
+    return [(r["id"], r["task_name"]) for r in rows]
+
+
+async def update_task_statuses(task_ids: list[str], status: str) -> None:
+    await _write_many(UPDATE_TASK_STATUS_SQL, [(status, task_id) for task_id in task_ids])
+
+
+async def finish_tasks(outcomes: list[tuple[str, str, str, str | None]]) -> None:
+    """Record (task_id, task_name, status, result) outcomes in one transaction."""
+    if not outcomes:
+        return
+    db = await get_db()
+    now = _now_us()
+    async with _write_lock:
+        try:
+            await db.execute("BEGIN IMMEDIATE")
+            await db.executemany(
+                UPDATE_TASK_STATUS_SQL, [(status, task_id) for task_id, _, status, _ in outcomes]
+            )
+            await db.executemany(
+                INSERT_TASK_SQL,
+                [(task_id, name, now, status, result) for task_id, name, status, result in outcomes],
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
 
 
 async def cancel_scheduled_task(task_id: str) -> bool:
     db = await get_db()
-    cursor = await db.execute(
-        "UPDATE scheduled_tasks SET status = 'cancelled' WHERE id = ? AND status = 'pending'",
-        (task_id,),
-    )
-    await db.commit()
+    async with _write_lock:
+        cursor = await db.execute(
+            "UPDATE scheduled_tasks SET status = 'cancelled' WHERE id = ? AND status = 'pending'",
+            (task_id,),
+        )
+        await db.commit()
     return cursor.rowcount > 0
 
 
@@ -332,7 +794,6 @@ async def get_cost_report(project: str | None = None) -> dict:
     """Get estimated costs by model using token usage and pricing."""
     from sprout.router import MODEL_PRICING
 
-    conn = await get_db()
     if project:
         query = """
             SELECT tu.model, SUM(tu.estimated_tokens) as total_tokens, COUNT(*) as count
@@ -349,31 +810,41 @@ async def get_cost_report(project: str | None = None) -> dict:
         """
         params = []
 
-    async with conn.execute(query, params) as cursor:
-        result = {}
-        for row in await cursor.fetchall():
-            model = row["model"]
-            tokens = row["total_tokens"]
-            price_per_m = MODEL_PRICING.get(model, 0.0)
-            result[model] = {
-                "total_tokens": tokens,
-                "count": row["count"],
-                "estimated_cost": (tokens / 1_000_000) * price_per_m,
-            }
+    async with _reader() as conn:
+        rows = await conn.execute_fetchall(query, params)
+    result = {}
+    for row in rows:
+        model = row["model"]
+        tokens = row["total_tokens"]
+        price_per_m = MODEL_PRICING.get(model, 0.0)
+        result[model] = {
+            "total_tokens": tokens,
+            "count": row["count"],
+            "estimated_cost": (tokens / 1_000_000) * price_per_m,
+        }
     return result
 
 
 async def record_retry(chunk_id: str, error_message: str) -> int:
     """Record a retry attempt. Returns total retry count for this chunk."""
     conn = await get_db()
-    now = datetime.now(timezone.utc).isoformat()
-    await conn.execute(
-        "INSERT INTO retries (chunk_id, error_message, recorded_at) VALUES (?, ?, ?)",
-        (chunk_id, error_message, now),
-    )
-    await conn.commit()
-    async with conn.execute(
-        "SELECT COUNT(*) as cnt FROM retries WHERE chunk_id = ?", (chunk_id,)
-    ) as cursor:
-        row = await cursor.fetchone()
+    async with _write_lock:
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            await conn.execute(INSERT_RETRY_SQL, (chunk_id, error_message, _now_us()))
+            if HAS_RETURNING:
+                async with conn.execute(
+                    BUMP_RETRY_COUNT_SQL + " RETURNING cnt", (chunk_id,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+            else:
+                await conn.execute(BUMP_RETRY_COUNT_SQL, (chunk_id,))
+                async with conn.execute(
+                    "SELECT cnt FROM retry_counts WHERE chunk_id = ?", (chunk_id,)
+                ) as cursor:
+                    row = await cursor.fetchone()
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
     return row["cnt"]
@@ -1,8 +1,12 @@
 """Model routing table and review logic."""
 
-import json
 import os
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+
+from sprout import _json
 
 _DEFAULT_ROUTING_TABLE: dict[str, tuple[str, str]] = {
     "biography_synthesis": ("haiku", "Factual summarization from web sources"),
@@ -18,19 +22,19 @@ _DEFAULT_ROUTING_TABLE: dict[str, tuple[str, str]] = {
     "complex_analysis": ("opus", "Deep reasoning required"),
 }
 
-# Maps model short names to full identifiers
-MODEL_IDS = {
+# Maps model short names to full identifiers (read-only)
+MODEL_IDS: Mapping[str, str] = MappingProxyType({
     "haiku": "haiku-4.5",
     "sonnet": "sonnet-4.6",
     "opus": "opus-4.6",
-}
+})
 
-# Auto-assign confidence based on producing model
-MODEL_CONFIDENCE = {
+# Auto-assign confidence based on producing model (read-only)
+MODEL_CONFIDENCE: Mapping[str, str] = MappingProxyType({
     "haiku-4.5": "seed",
     "sonnet-4.6": "watered",
     "opus-4.6": "sprouted",
-}
+})
 
 # Output token pricing per million tokens (Anthropic, Feb 2026)
 MODEL_PRICING: dict[str, float] = {
@@ -41,6 +45,23 @@ MODEL_PRICING: dict[str, float] = {
 
 # Runtime routing table (starts from defaults, can be extended)
 _routing_table: dict[str, tuple[str, str]] = dict(_DEFAULT_ROUTING_TABLE)
+# Live read-only view handed to callers; reflects add_route() without copying
+_routing_view: Mapping[str, tuple[str, str]] = MappingProxyType(_routing_table)
+
+
+# Parsed SPROUT_CONFIG files keyed by path, valid while (st_mtime_ns, st_size) match.
+# Carried over from the previous module namespace so importlib.reload() reuses it.
+_config_cache: dict[str, tuple[int, int, dict]] = globals().get("_config_cache", {})
+
+
+def _read_config(p: Path) -> dict:
+    st = p.stat()
+    cached = _config_cache.get(str(p))
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    data = _json.loads(p.read_bytes())
+    _config_cache[str(p)] = (st.st_mtime_ns, st.st_size, data)
+    return data
 
 
 def _load_config_routes() -> None:
@@ -51,39 +72,55 @@ def _load_config_routes() -> None:
     p = Path(config_path)
     if not p.exists():
         return
-    data = json.loads(p.read_text())
+    data = _read_config(p)
     for task_type, route in data.get("routes", {}).items():
         _routing_table[task_type] = (route["tier"], route.get("reason", "Custom route"))
     for model, price in data.get("pricing", {}).items():
         MODEL_PRICING[model] = float(price)
+    _recommend_cached.cache_clear()
+
+
+_DEFAULT_RECOMMENDATION: Mapping[str, str] = MappingProxyType({
+    "recommended_model": MODEL_IDS["haiku"],
+    "tier": "haiku",
+    "reason": "Default: start cheap, escalate if needed",
+})
+
+
+@lru_cache(maxsize=1024)
+def _recommend_cached(task_type: str) -> Mapping[str, str]:
+    # Read-only views, so callers can share them without defensive copies.
+    # Bounded because task_type comes straight from tool callers.
+    route = _routing_table.get(task_type)
+    if route is None:
+        return MappingProxyType({"task_type": task_type, **_DEFAULT_RECOMMENDATION})
+    tier, reason = route
+    return MappingProxyType({
+        "task_type": task_type,
+        "recommended_model": MODEL_IDS[tier],
+        "tier": tier,
+        "reason": reason,
+    })
 
 
 _load_config_routes()
 
 
-def get_routing_table() -> dict[str, tuple[str, str]]:
+def get_routing_table() -> Mapping[str, tuple[str, str]]:
+    return _routing_view
+
+
+def get_routing_table_copy() -> dict[str, tuple[str, str]]:
     return dict(_routing_table)
 
 
 def add_route(task_type: str, tier: str, reason: str) -> None:
     _routing_table[task_type] = (tier, reason)
+    _recommend_cached.cache_clear()
 
 
-def recommend_model(task_type: str) -> dict:
-    if task_type in _routing_table:
-        tier, reason = _routing_table[task_type]
-        return {
-            "task_type": task_type,
-            "recommended_model": MODEL_IDS[tier],
-            "tier": tier,
-            "reason": reason,
-        }
-    return {
-        "task_type": task_type,
-        "recommended_model": MODEL_IDS["haiku"],
-        "tier": "haiku",
-        "reason": "Default: start cheap, escalate if needed",
-    }
+def recommend_model(task_type: str) -> Mapping[str, str]:
+    return _recommend_cached(task_type)
 
 
 def confidence_for_model(model: str) -> str:
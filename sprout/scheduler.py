@@ -1,10 +1,14 @@
 """Background task scheduler with asyncio loop + optional daemon mode."""
 
 import asyncio
-import json
+import io
 import logging
 import sys
-from datetime import datetime, timezone
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+
+from sprout import _json, db
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,69 +17,109 @@ logging.basicConfig(
 log = logging.getLogger("sprout.scheduler")
 
 CHECK_INTERVAL = 60  # seconds
+TASK_CONCURRENCY = 4  # due tasks run at once per tick
+
+# Set by wake() to cut the current sleep short; created by the running loop
+_wake: asyncio.Event | None = None
+
+
+def wake() -> None:
+    """Re-check the schedule now, e.g. after a task was added or cancelled."""
+    if _wake is not None:
+        _wake.set()
+
+
+async def _h_opus_test(task_params: dict | None) -> str:
+    """Generate review summary."""
+    chunks = await db.get_review_queue()
+    by_type: defaultdict[str, list] = defaultdict(list)
+    for c in chunks:
+        by_type[c.provenance.task_type].append(c)
+
+    buf = io.StringIO()
+    w = buf.write
+    w("## OpusTest Review Summary\n")
+    for task_type, type_chunks in sorted(by_type.items()):
+        w("\n### %s (%d chunks)\n" % (task_type, len(type_chunks)))
+        for c in type_chunks:
+            prov = c.provenance
+            srcs = prov.sources
+            w("- **")
+            w(c.node_id)
+            w("** [")
+            w(prov.confidence.value)
+            w("] sources: ")
+            w(", ".join(srcs[:3]) if srcs else "none")
+            w("\n")
+    return buf.getvalue()
+
+
+async def _h_export_chunks(task_params: dict | None) -> str:
+    project = (task_params or {}).get("project")
+    min_conf = (task_params or {}).get("min_confidence", "watered")
+    result = await db.export_chunks(project=project, min_confidence=min_conf)
+    return _json.dumps_indent(result)
+
+
+async def _h_get_stats(task_params: dict | None) -> str:
+    stats = await db.get_stats()
+    return _json.dumps_indent(stats)
+
+
+# Task name -> handler coroutine; add new scheduled task types here
+_HANDLERS: dict[str, Callable[[dict | None], Awaitable[str]]] = {
+    "opus_test": _h_opus_test,
+    "export_chunks": _h_export_chunks,
+    "get_stats": _h_get_stats,
+}
 
 
 async def _execute_task(task_name: str, task_params: dict | None) -> str:
     """Execute a scheduled task by name. Returns result string."""
-    # Import here to avoid circular imports
-    from sprout import db
-
-    if task_name == "opus_test":
-        # Generate review summary
-        chunks = await db.get_review_queue()
-        by_type: dict[str, list] = {}
-        for c in chunks:
-            by_type.setdefault(c.provenance.task_type, []).append(c)
-
-        lines = [f"## OpusTest Review Summary\n"]
-        for task_type, type_chunks in sorted(by_type.items()):
-            lines.append(f"### {task_type} ({len(type_chunks)} chunks)")
-            for c in type_chunks:
-                sources = ", ".join(c.provenance.sources[:3]) if c.provenance.sources else "none"
-                lines.append(f"- **{c.node_id}** [{c.provenance.confidence.value}] sources: {sources}")
-            lines.append("")
-        return "\n".join(lines)
-
-    elif task_name == "export_chunks":
-        project = (task_params or {}).get("project")
-        min_conf = (task_params or {}).get("min_confidence", "watered")
-        result = await db.export_chunks(project=project, min_confidence=min_conf)
-        return json.dumps(result, indent=2)
-
-    elif task_name == "get_stats":
-        stats = await db.get_stats()
-        return json.dumps(stats, indent=2)
-
-    else:
+    handler = _HANDLERS.get(task_name)
+    if handler is None:
         return f"Unknown task: {task_name}"
+    return await handler(task_params)
 
 
-async def run_scheduler_loop():
-    """Check for due tasks every CHECK_INTERVAL seconds."""
-    from sprout import db as db_mod
+async def _run_one(task, sem: asyncio.Semaphore) -> tuple[str, str, str, str]:
+    """Run one due task and return its (task_id, task_name, status, result) outcome."""
+    async with sem:
+        log.info(f"Executing task {task.id}: {task.task_name}")
+        try:
+            result = await _execute_task(task.task_name, task.task_params)
+        except Exception as e:
+            log.error(f"Task {task.id} failed: {e}")
+            return (task.id, task.task_name, "failed", str(e))
+        log.info(f"Task {task.id} completed")
+        return (task.id, task.task_name, "completed", result)
+
 
+async def run_scheduler_loop():
+    """Run due tasks, sleeping until the next run_at (at most CHECK_INTERVAL) or a wake()."""
+    global _wake
+    await db.init_db()
+    sem = asyncio.Semaphore(TASK_CONCURRENCY)
+    _wake = asyncio.Event()
     log.info("Scheduler loop started")
     while True:
+        delay = CHECK_INTERVAL
         try:
-            pending = await db_mod.get_pending_tasks()
-            now = datetime.now(timezone.utc)
-            for task in pending:
-                run_at = task.run_at if task.run_at.tzinfo else task.run_at.replace(tzinfo=timezone.utc)
-                if run_at <= now:
-                    log.info(f"Executing task {task.id}: {task.task_name}")
-                    await db_mod.update_task_status(task.id, "running")
-                    try:
-                        result = await _execute_task(task.task_name, task.task_params)
-                        await db_mod.update_task_status(task.id, "completed")
-                        await db_mod.record_task_run(task.id, task.task_name, "completed", result)
-                        log.info(f"Task {task.id} completed")
-                    except Exception as e:
-                        await db_mod.update_task_status(task.id, "failed")
-                        await db_mod.record_task_run(task.id, task.task_name, "failed", str(e))
-                        log.error(f"Task {task.id} failed: {e}")
+            due = await db.get_due_tasks(time.time_ns() // 1000)
+            if due:
+                await db.update_task_statuses([t.id for t in due], "running")
+                outcomes = await asyncio.gather(*[_run_one(t, sem) for t in due])
+                await db.finish_tasks(list(outcomes))
+            next_us = await db.get_next_run_at()
+            if next_us is not None:
+                delay = max(0.0, min(CHECK_INTERVAL, next_us / 1_000_000 - time.time()))
         except Exception as e:
             log.error(f"Scheduler error: {e}")
-        await asyncio.sleep(CHECK_INTERVAL)
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=delay)
+        except TimeoutError:
+            pass
+        _wake.clear()
 
 
 def run_daemon():
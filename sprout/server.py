@@ -1,14 +1,16 @@
 """Sprout MCP server — model-tiered research with provenance tracking."""
 
 import asyncio
+import io
 import json
+from collections import defaultdict
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime, timedelta, timezone
 
 from fastmcp import FastMCP
 
-from sprout import db
+from sprout import _json, db
 from sprout.models import Chunk, Confidence, Provenance, ScheduledTask
 from sprout.router import (
     confidence_for_model,
@@ -17,20 +19,28 @@ from sprout.router import (
     add_route,
     MODEL_PRICING,
 )
-from sprout.scheduler import run_scheduler_loop
+from sprout.scheduler import run_scheduler_loop, wake as wake_scheduler
 
 _scheduler_task: asyncio.Task | None = None
 
+# Confidence levels a review can move a chunk to
+_VALID_CONFIDENCES = frozenset({"watered", "sprouted", "rejected"})
+
 
 @asynccontextmanager
 async def lifespan(server: FastMCP) -> AsyncIterator[None]:
     global _scheduler_task
+    await db.init_db()
     _scheduler_task = asyncio.create_task(run_scheduler_loop())
     try:
         yield
     finally:
         if _scheduler_task and not _scheduler_task.done():
             _scheduler_task.cancel()
+            # Let an in-flight tick unwind before its connections go away
+            with suppress(asyncio.CancelledError):
+                await _scheduler_task
+        await db.close_db()
 
 
 mcp = FastMCP(
@@ -100,14 +110,26 @@ async def get_review_queue(
     chunks = await db.get_review_queue(project, node_type, confidence, limit)
     if not chunks:
         return "No chunks in review queue."
-    lines = [f"## Review Queue ({len(chunks)} chunks)\n"]
+    # One buffer, written piecewise: no per-line strings and no final join copy
+    buf = io.StringIO()
+    w = buf.write
+    w("## Review Queue (%d chunks)\n" % len(chunks))
     for c in chunks:
-        sources = ", ".join(c.provenance.sources[:2]) if c.provenance.sources else "none"
-        lines.append(
-            f"- **{c.id[:8]}** | {c.node_id}.{c.field} [{c.provenance.confidence.value}] "
-            f"by {c.provenance.produced_by} | sources: {sources}"
-        )
-    return "\n".join(lines)
+        prov = c.provenance
+        srcs = prov.sources
+        w("\n- **")
+        w(c.id[:8])
+        w("** | ")
+        w(c.node_id)
+        w(".")
+        w(c.field)
+        w(" [")
+        w(prov.confidence.value)
+        w("] by ")
+        w(prov.produced_by)
+        w(" | sources: ")
+        w(", ".join(srcs[:2]) if srcs else "none")
+    return buf.getvalue()
 
 
 @mcp.tool()
@@ -125,9 +147,8 @@ async def mark_reviewed(
         new_confidence: New confidence level (watered, sprouted, rejected)
         review_notes: Optional rejection reason or reviewer comments
     """
-    valid = {"watered", "sprouted", "rejected"}
-    if new_confidence not in valid:
-        return f"Invalid confidence. Must be one of: {valid}"
+    if new_confidence not in _VALID_CONFIDENCES:
+        return f"Invalid confidence. Must be one of: {', '.join(sorted(_VALID_CONFIDENCES))}"
     chunk = await db.mark_reviewed(chunk_id, verified_by, new_confidence, review_notes)
     if not chunk:
         return f"Chunk {chunk_id} not found."
@@ -158,14 +179,11 @@ async def get_stats(project: str | None = None) -> str:
     stats = await db.get_stats(project)
     lines = [f"## Sprout Stats (total: {stats['total']})\n"]
     lines.append("### By Confidence")
-    for conf, count in sorted(stats["by_confidence"].items()):
-        lines.append(f"- {conf}: {count}")
+    lines.extend("- %s: %s" % item for item in sorted(stats["by_confidence"].items()))
     lines.append("\n### By Project")
-    for proj, count in sorted(stats["by_project"].items()):
-        lines.append(f"- {proj}: {count}")
+    lines.extend("- %s: %s" % item for item in sorted(stats["by_project"].items()))
     lines.append("\n### By Task Type")
-    for tt, count in sorted(stats["by_type"].items()):
-        lines.append(f"- {tt}: {count}")
+    lines.extend("- %s: %s" % item for item in sorted(stats["by_type"].items()))
     if stats.get("token_usage"):
         lines.append("\n### Token Usage")
         for model, info in sorted(stats["token_usage"].items()):
@@ -185,7 +203,7 @@ async def export_chunks(
         min_confidence: Minimum confidence level (seed, watered, sprouted). Default: watered
     """
     chunks = await db.export_chunks(project, min_confidence)
-    return json.dumps(chunks, indent=2)
+    return _json.dumps_indent(chunks)
 
 
 @mcp.tool()
@@ -199,30 +217,44 @@ async def opus_test() -> str:
     if not chunks:
         return "No chunks pending review."
 
-    by_type: dict[str, list[Chunk]] = {}
+    # Group and tally in one pass over the queue
+    by_type: defaultdict[str, list[Chunk]] = defaultdict(list)
+    counts = {Confidence.SEED: 0, Confidence.WATERED: 0}
     for c in chunks:
-        by_type.setdefault(c.provenance.task_type, []).append(c)
+        prov = c.provenance
+        by_type[prov.task_type].append(c)
+        counts[prov.confidence] = counts.get(prov.confidence, 0) + 1
 
-    lines = ["## OpusTest Review Summary\n"]
-    seed_count = sum(1 for c in chunks if c.provenance.confidence == Confidence.SEED)
-    watered_count = sum(1 for c in chunks if c.provenance.confidence == Confidence.WATERED)
-    lines.append(f"**{len(chunks)} chunks**: {seed_count} seed, {watered_count} watered\n")
+    buf = io.StringIO()
+    w = buf.write
+    w("## OpusTest Review Summary\n\n")
+    w("**%d chunks**: %d seed, %d watered\n\n" % (
+        len(chunks), counts[Confidence.SEED], counts[Confidence.WATERED],
+    ))
 
     for task_type, type_chunks in sorted(by_type.items()):
-        lines.append(f"### {task_type} ({len(type_chunks)} chunks)")
+        w("### %s (%d chunks)\n" % (task_type, len(type_chunks)))
         for c in type_chunks:
-            sources = " | ".join(c.provenance.sources[:3]) if c.provenance.sources else "no sources"
-            lines.append(
-                f"- `{c.id[:8]}` **{c.node_id}**.{c.field} "
-                f"[{c.provenance.confidence.value}] — {sources}"
-            )
-        lines.append("")
-
-    lines.append("### Recommended Workflow")
-    lines.append("1. Spawn Sonnet agents for seed → watered (fact-check first pass)")
-    lines.append("2. Spawn Opus agent for watered → sprouted (deep verification)")
-    lines.append("3. Export sprouted chunks via `export_chunks`")
-    return "\n".join(lines)
+            prov = c.provenance
+            srcs = prov.sources
+            w("- `")
+            w(c.id[:8])
+            w("` **")
+            w(c.node_id)
+            w("**.")
+            w(c.field)
+            w(" [")
+            w(prov.confidence.value)
+            w("] — ")
+            w(" | ".join(srcs[:3]) if srcs else "no sources")
+            w("\n")
+        w("\n")
+
+    w("### Recommended Workflow\n")
+    w("1. Spawn Sonnet agents for seed → watered (fact-check first pass)\n")
+    w("2. Spawn Opus agent for watered → sprouted (deep verification)\n")
+    w("3. Export sprouted chunks via `export_chunks`")
+    return buf.getvalue()
 
 
 @mcp.tool()
@@ -240,19 +272,19 @@ async def schedule_task(
         delay_minutes: Minutes from now to run
         task_params: Optional JSON string of parameters
     """
-    if not run_at and not delay_minutes:
-        return "Provide either run_at or delay_minutes."
-
     if delay_minutes:
         when = datetime.now(timezone.utc) + timedelta(minutes=delay_minutes)
-    else:
-        when = datetime.fromisoformat(run_at)  # type: ignore
+    elif run_at:
+        when = datetime.fromisoformat(run_at)
         if when.tzinfo is None:
             when = when.replace(tzinfo=timezone.utc)
+    else:
+        return "Provide either run_at or delay_minutes."
 
     params = json.loads(task_params) if task_params else None
     task = ScheduledTask(task_name=task_name, task_params=params, run_at=when)
     await db.insert_scheduled_task(task)
+    wake_scheduler()
     return f"Scheduled {task_name} → {when.isoformat()} (id: {task.id[:8]})"
 
 
@@ -275,18 +307,18 @@ async def cancel_scheduled(task_id: str) -> str:
     Args:
         task_id: Full or partial UUID of the task
     """
-    # Try exact match first, then prefix match
-    tasks = await db.get_pending_tasks()
-    match = None
-    for t in tasks:
-        if t.id == task_id or t.id.startswith(task_id):
-            match = t
-            break
-    if not match:
+    # A full id is its own prefix, so one lookup covers exact and partial matches
+    matches = await db.find_pending_by_id_prefix(task_id)
+    if not matches:
         return f"No pending task matching '{task_id}'."
-
-    ok = await db.cancel_scheduled_task(match.id)
-    return f"Cancelled task {match.id[:8]} ({match.task_name})" if ok else "Failed to cancel."
+    if len(matches) > 1:
+        return f"Task id '{task_id}' is ambiguous; give more characters."
+    match_id, match_name = matches[0]
+
+    ok = await db.cancel_scheduled_task(match_id)
+    if ok:
+        wake_scheduler()
+    return f"Cancelled task {match_id[:8]} ({match_name})" if ok else "Failed to cancel."
 
 
 @mcp.tool()
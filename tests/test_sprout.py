@@ -4,6 +4,7 @@ import asyncio
 import json
 import os
 import tempfile
+from datetime import datetime, timezone
 
 import pytest
 import pytest_asyncio
@@ -12,6 +13,8 @@ import pytest_asyncio
 _tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
 _tmp.close()
 os.environ["SPROUT_DB_PATH"] = _tmp.name
+# Throwaway DB: skip fsyncs. WAL stays on, since the read pool depends on it.
+os.environ["SPROUT_SYNCHRONOUS"] = "OFF"
 
 import sprout.db as db
 
@@ -23,13 +26,27 @@ from sprout.models import Chunk, Confidence, Provenance
 from sprout.router import confidence_for_model, recommend_model
 
 
+@pytest.fixture(scope="session", autouse=True)
+async def database():
+    await db.init_db()
+    yield
+    await db.close_db()
+
+
 @pytest.fixture(autouse=True)
-async def reset_db():
-    db._db = None
+async def clean_db():
+    conn = db._db
     yield
-    if db._db:
-        await db._db.close()
-        db._db = None
+    if db._db is not conn:
+        # The test reopened the DB (cold start, other path); restore the shared one
+        await db.close_db()
+        await db.init_db()
+        return
+    async with db._write_lock:
+        await conn.execute("BEGIN IMMEDIATE")
+        for table in db._TABLES:
+            await conn.execute(f"DELETE FROM {table}")
+        await conn.commit()
 
 
 @pytest.mark.asyncio
@@ -38,6 +55,56 @@ async def test_recommend_model():
     assert rec["tier"] == "haiku"
     assert rec["recommended_model"] == "haiku-4.5"
 
+    unknown = recommend_model("unmapped_task")
+    assert unknown["task_type"] == "unmapped_task"
+    assert unknown["tier"] == "haiku"
+
+
+@pytest.mark.asyncio
+async def test_add_route_updates_recommendation():
+    from sprout.router import add_route
+
+    add_route("translation", "sonnet", "Nuanced language task")
+    rec = recommend_model("translation")
+    assert rec["tier"] == "sonnet"
+    assert rec["recommended_model"] == "sonnet-4.6"
+
+
+def test_routing_table_view():
+    from sprout import router
+
+    table = router.get_routing_table()
+    with pytest.raises(TypeError):
+        table["x"] = ("opus", "nope")
+    router.add_route("view_task", "opus", "Live view")
+    assert table["view_task"] == ("opus", "Live view")
+
+    copy = router.get_routing_table_copy()
+    copy.pop("view_task")
+    assert "view_task" in table
+    router._routing_table.pop("view_task")
+    router._recommend_cached.cache_clear()
+
+
+def test_config_parse_survives_reload(monkeypatch, tmp_path):
+    import importlib
+
+    from sprout import router
+
+    cfg = tmp_path / "sprout.json"
+    cfg.write_text(json.dumps({"routes": {"cfg_task": {"tier": "opus"}}}))
+    monkeypatch.setenv("SPROUT_CONFIG", str(cfg))
+    importlib.reload(router)
+    assert router.recommend_model("cfg_task")["tier"] == "opus"
+
+    monkeypatch.setattr(router._json, "loads", lambda raw: pytest.fail("config reparsed"))
+    importlib.reload(router)
+    assert router.recommend_model("cfg_task")["tier"] == "opus"
+
+    monkeypatch.undo()
+    importlib.reload(router)
+    assert "cfg_task" not in router.get_routing_table()
+
 
 @pytest.mark.asyncio
 async def test_confidence_for_model():
@@ -92,6 +159,15 @@ async def test_mark_reviewed():
     assert updated is not None
     assert updated.provenance.confidence == Confidence.WATERED
     assert updated.provenance.verified_by == "sonnet-4.6"
+    assert updated.provenance.verified_at is not None
+
+    assert await db.mark_reviewed("missing-chunk", "opus-4.6", "sprouted") is None
+
+
+@pytest.mark.asyncio
+async def test_mark_reviewed_without_returning(monkeypatch):
+    monkeypatch.setattr(db, "HAS_RETURNING", False)
+    await test_mark_reviewed()
 
 
 @pytest.mark.asyncio
@@ -118,11 +194,183 @@ async def test_export_chunks():
     assert john["confidence"] == "watered"
 
 
+@pytest.mark.asyncio
+async def test_export_chunks_json(tmp_path):
+    await db.insert_chunk(Chunk(
+        project="ndjson",
+        node_id="cath-council-001",
+        node_type="Council",
+        field="description",
+        content="The First Council of Nicaea met in 325.",
+        provenance=Provenance(
+            produced_by="sonnet-4.6",
+            task_type="council_description",
+            sources=["https://example.com/nicaea"],
+            confidence=Confidence.WATERED,
+        ),
+    ))
+    out = tmp_path / "export.ndjson"
+    count = await db.export_chunks_json(out, project="ndjson")
+    records = [json.loads(line) for line in out.read_bytes().splitlines()]
+    assert count == len(records) == 1
+    assert records[0]["nodeId"] == "cath-council-001"
+    assert records[0]["sources"] == ["https://example.com/nicaea"]
+
+
 @pytest.mark.asyncio
 async def test_stats():
+    rows = [
+        ("theology", Confidence.SEED, "biography_synthesis"),
+        ("theology", Confidence.SEED, "council_description"),
+        ("theology", Confidence.WATERED, "biography_synthesis"),
+        ("history", Confidence.SPROUTED, "biography_synthesis"),
+        ("history", Confidence.WATERED, "document_synopsis"),
+    ]
+    await db.insert_chunks_many([
+        Chunk(
+            project=project,
+            node_id=f"stats-{i}",
+            node_type="Person",
+            field="biography",
+            content="Stats row.",
+            provenance=Provenance(produced_by="haiku-4.5", task_type=task_type, confidence=conf),
+        )
+        for i, (project, conf, task_type) in enumerate(rows)
+    ])
+
     stats = await db.get_stats()
-    assert "by_confidence" in stats
-    assert "total" in stats
+    assert stats["total"] == 5
+    assert stats["by_confidence"] == {"seed": 2, "watered": 2, "sprouted": 1}
+    assert stats["by_project"] == {"theology": 3, "history": 2}
+    assert stats["by_type"] == {
+        "biography_synthesis": 3, "council_description": 1, "document_synopsis": 1,
+    }
+
+    stats = await db.get_stats(project="history")
+    assert stats["total"] == 2
+    assert stats["by_confidence"] == {"sprouted": 1, "watered": 1}
+    assert stats["by_project"] == {"history": 2}
+    assert stats["by_type"] == {"biography_synthesis": 1, "document_synopsis": 1}
+
+
+@pytest.mark.asyncio
+async def test_cost_report_uses_covering_index():
+    conn = await db.get_db()
+    plan = await conn.execute_fetchall(
+        "EXPLAIN QUERY PLAN SELECT tu.model, SUM(tu.estimated_tokens) FROM token_usage tu "
+        "JOIN chunks c ON tu.chunk_id = c.id WHERE c.project = ? GROUP BY tu.model",
+        ("test",),
+    )
+    assert any("COVERING INDEX idx_token_usage_chunk" in row["detail"] for row in plan)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads(monkeypatch):
+    opened = []
+    connect = db._connect
+
+    async def counting_connect():
+        conn = await connect()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(db, "_connect", counting_connect)
+    await db.close_db()
+
+    # Cold start: concurrent first use must initialize exactly once, and
+    # more readers than pooled connections must queue, not fail
+    results = await asyncio.gather(*[db.get_stats() for _ in range(db.READ_POOL_SIZE * 2)])
+    assert all("total" in r for r in results)
+    assert len(db._read_conns) == db.READ_POOL_SIZE
+    assert db._read_pool.qsize() == db.READ_POOL_SIZE
+    # One writer plus the read pool
+    assert len(opened) == db.READ_POOL_SIZE + 1
+
+
+@pytest.mark.asyncio
+async def test_reader_outlives_close_db():
+    async with db._reader() as conn:
+        await db.close_db()
+        await db.init_db()
+    assert conn not in db._read_conns
+    assert db._read_pool.qsize() == db.READ_POOL_SIZE
+    assert (await db.get_stats())["total"] == 0
+
+    # Shutdown with a read in flight must not touch the dropped pool
+    async with db._reader():
+        await db.close_db()
+    assert db._read_pool is None
+
+
+@pytest.mark.asyncio
+async def test_batched_writes_isolate_failures():
+    chunks = [
+        Chunk(
+            project="batch",
+            node_id=f"batch-{i:03d}",
+            node_type="Person",
+            field="biography",
+            content="Batched write.",
+            provenance=Provenance(produced_by="haiku-4.5", task_type="biography_synthesis"),
+        )
+        for i in range(20)
+    ]
+    results = await asyncio.gather(
+        *[db.insert_chunk(c) for c in chunks],
+        db._write("INSERT INTO missing_table VALUES (?)", (1,)),
+        return_exceptions=True,
+    )
+    assert all(r is None for r in results[:-1])
+    assert isinstance(results[-1], Exception)
+
+    stats = await db.get_stats(project="batch")
+    assert stats["total"] == 20
+
+
+@pytest.mark.asyncio
+async def test_insert_chunks_many():
+    chunks = [
+        Chunk(
+            project="bulk",
+            node_id=f"bulk-{i:03d}",
+            node_type="Document",
+            field="synopsis",
+            content="Bulk insert.",
+            provenance=Provenance(produced_by="haiku-4.5", task_type="document_synopsis"),
+        )
+        for i in range(50)
+    ]
+    await db.insert_chunks_many(chunks)
+
+    stats = await db.get_stats(project="bulk")
+    assert stats["total"] == 50
+
+
+@pytest.mark.asyncio
+async def test_writer_survives_failed_batch(monkeypatch):
+    flush = db._flush
+    calls = 0
+
+    async def flaky_flush(conn, batch):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("boom")
+        await flush(conn, batch)
+
+    monkeypatch.setattr(db, "_flush", flaky_flush)
+    with pytest.raises(RuntimeError):
+        await db.update_task_status("missing", "failed")
+    # The writer keeps serving later writes
+    await db.update_task_status("missing", "failed")
+    assert not db._writer_task.done()
+
+
+@pytest.mark.asyncio
+async def test_record_retry_counts():
+    assert await db.record_retry("retry-chunk", "500 Internal Server Error") == 1
+    assert await db.record_retry("retry-chunk", "500 Internal Server Error") == 2
+    assert await db.record_retry("other-chunk", "timeout") == 1
 
 
 @pytest.mark.asyncio
@@ -139,5 +387,175 @@ async def test_scheduled_tasks():
     pending = await db.get_pending_tasks()
     assert any(t.id == task.id for t in pending)
 
+    now_us = db._now_us()
+    assert all(t.id != task.id for t in await db.get_due_tasks(now_us))
+    assert any(t.id == task.id for t in await db.get_due_tasks(now_us + 3 * 3600 * 1_000_000))
+
     cancelled = await db.cancel_scheduled_task(task.id)
     assert cancelled is True
+
+
+@pytest.mark.asyncio
+async def test_find_pending_by_id_prefix():
+    from sprout.models import ScheduledTask
+
+    run_at = datetime.now(timezone.utc)
+    for task_id in ("feed0001-a", "feed0002-b", "f*ed0003-c"):
+        await db.insert_scheduled_task(ScheduledTask(id=task_id, task_name="get_stats", run_at=run_at))
+
+    assert await db.find_pending_by_id_prefix("feed0001") == [("feed0001-a", "get_stats")]
+    assert await db.find_pending_by_id_prefix("feed0002-b") == [("feed0002-b", "get_stats")]
+    assert len(await db.find_pending_by_id_prefix("feed")) == 2
+    assert await db.find_pending_by_id_prefix("f*") == [("f*ed0003-c", "get_stats")]
+    assert await db.find_pending_by_id_prefix("FEED0001") == []
+
+    conn = await db.get_db()
+    plan = await conn.execute_fetchall(
+        "EXPLAIN QUERY PLAN SELECT id FROM scheduled_tasks WHERE id GLOB ? AND +status = 'pending'",
+        ("feed*",),
+    )
+    assert "sqlite_autoindex_scheduled_tasks_1" in plan[0]["detail"]
+    await db.update_task_statuses(["feed0001-a", "feed0002-b", "f*ed0003-c"], "cancelled")
+
+
+@pytest.mark.asyncio
+async def test_finish_tasks_batch():
+    from sprout.models import ScheduledTask
+
+    tasks = [ScheduledTask(task_name="get_stats", run_at=datetime.now(timezone.utc)) for _ in range(3)]
+    for t in tasks:
+        await db.insert_scheduled_task(t)
+    ids = [t.id for t in tasks]
+    await db.update_task_statuses(ids, "running")
+    assert not {t.id for t in await db.get_pending_tasks()} & set(ids)
+
+    await db.finish_tasks([(t.id, t.task_name, "completed", "ok") for t in tasks])
+    conn = await db.get_db()
+    rows = await conn.execute_fetchall(
+        f"SELECT status FROM scheduled_tasks WHERE id IN ({','.join('?' * len(ids))})", ids
+    )
+    assert [r["status"] for r in rows] == ["completed"] * 3
+    runs = await conn.execute_fetchall(
+        f"SELECT COUNT(*) FROM task_runs WHERE task_id IN ({','.join('?' * len(ids))})", ids
+    )
+    assert runs[0][0] == 3
+
+
+@pytest.mark.asyncio
+async def test_execute_task_dispatch():
+    from sprout import scheduler
+
+    assert set(scheduler._HANDLERS) == {"opus_test", "export_chunks", "get_stats"}
+    assert json.loads(await scheduler._execute_task("get_stats", None))["total"] >= 0
+    assert await scheduler._execute_task("nope", None) == "Unknown task: nope"
+
+
+@pytest.mark.asyncio
+async def test_due_tasks_run_concurrently(monkeypatch):
+    from sprout import scheduler
+    from sprout.models import ScheduledTask
+
+    running = peak = 0
+
+    async def fake_execute(task_name, task_params):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if task_name == "boom":
+            raise ValueError("bad task")
+        return "done"
+
+    monkeypatch.setattr(scheduler, "_execute_task", fake_execute)
+    tasks = [
+        ScheduledTask(task_name="boom" if i == 0 else "get_stats", run_at=datetime.now(timezone.utc))
+        for i in range(6)
+    ]
+    sem = asyncio.Semaphore(scheduler.TASK_CONCURRENCY)
+    outcomes = await asyncio.gather(*[scheduler._run_one(t, sem) for t in tasks])
+    assert peak == scheduler.TASK_CONCURRENCY
+    assert outcomes[0] == (tasks[0].id, "boom", "failed", "bad task")
+    assert all(o[2] == "completed" for o in outcomes[1:])
+
+
+@pytest.mark.asyncio
+async def test_wake_runs_new_task_without_polling(monkeypatch):
+    from sprout import scheduler
+    from sprout.models import ScheduledTask
+
+    done = asyncio.Event()
+
+    async def fake_execute(task_name, task_params):
+        done.set()
+        return "done"
+
+    monkeypatch.setattr(scheduler, "CHECK_INTERVAL", 3600)
+    monkeypatch.setattr(scheduler, "_execute_task", fake_execute)
+    loop_task = asyncio.create_task(scheduler.run_scheduler_loop())
+    try:
+        await asyncio.sleep(0.05)
+        task = ScheduledTask(task_name="get_stats", run_at=datetime.now(timezone.utc))
+        await db.insert_scheduled_task(task)
+        scheduler.wake()
+        await asyncio.wait_for(done.wait(), timeout=2)
+        conn = await db.get_db()
+        for _ in range(100):
+            rows = await conn.execute_fetchall("SELECT status FROM scheduled_tasks WHERE id = ?", (task.id,))
+            if rows[0]["status"] == "completed":
+                break
+            await asyncio.sleep(0.01)
+        assert rows[0]["status"] == "completed"
+    finally:
+        loop_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await loop_task
+
+
+@pytest.mark.asyncio
+async def test_migrates_iso_timestamps(monkeypatch, tmp_path):
+    import sqlite3
+
+    legacy = tmp_path / "legacy.db"
+    conn = sqlite3.connect(legacy)
+    conn.executescript("""
+        CREATE TABLE chunks (
+            id TEXT PRIMARY KEY, project TEXT NOT NULL, node_id TEXT NOT NULL,
+            node_type TEXT NOT NULL, field TEXT NOT NULL, content TEXT NOT NULL,
+            produced_by TEXT NOT NULL, produced_at TEXT NOT NULL, task_type TEXT NOT NULL,
+            sources TEXT, verified_by TEXT, verified_at TEXT,
+            confidence TEXT NOT NULL DEFAULT 'seed', review_notes TEXT,
+            UNIQUE(project, node_id, field)
+        );
+        CREATE INDEX idx_confidence ON chunks(confidence);
+        INSERT INTO chunks VALUES (
+            'legacy-1', 'theology', 'cath-person-009', 'Person', 'biography', 'Legacy row.',
+            'haiku-4.5', '2026-02-01T12:30:00.123456+00:00', 'biography_synthesis',
+            '["https://example.com"]', NULL, NULL, 'seed', NULL
+        );
+        CREATE TABLE retries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, chunk_id TEXT NOT NULL,
+            error_message TEXT NOT NULL, recorded_at TEXT NOT NULL
+        );
+        INSERT INTO retries (chunk_id, error_message, recorded_at) VALUES
+            ('legacy-1', '500', '2026-02-01T12:31:00+00:00'),
+            ('legacy-1', '500', '2026-02-01T12:32:00+00:00');
+    """)
+    conn.close()
+    await db.close_db()
+    monkeypatch.setattr(db, "DB_PATH", legacy)
+
+    queue = await db.get_review_queue(project="theology")
+    assert len(queue) == 1
+    produced_at = queue[0].provenance.produced_at
+    assert produced_at == datetime(2026, 2, 1, 12, 30, 0, 123456, tzinfo=timezone.utc)
+    assert queue[0].provenance.sources == ["https://example.com"]
+    conn = await db.get_db()
+    async with conn.execute("SELECT typeof(sources) FROM chunks") as cursor:
+        assert (await cursor.fetchone())[0] == "blob"
+    # Retry totals are backfilled from the existing history
+    assert await db.record_retry("legacy-1", "500") == 3
+
+    # Running the schema setup again must not re-migrate
+    await db.close_db()
+    assert (await db.get_stats(project="theology"))["total"] == 1